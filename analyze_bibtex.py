@@ -1,43 +1,190 @@
-import bibtexparser
-from bibtexparser.bparser import BibTexParser
-from bibtexparser.customization import convert_to_unicode
+import mmap
+import os
+import re
+from bibtexparser.bibdatabase import COMMON_STRINGS, STANDARD_TYPES
 from collections import Counter
 from tabulate import tabulate
 
-def analyze_bibtex_file(input_file):
-    with open(input_file, 'r', encoding='utf-8') as bibtex_file:
-        parser = BibTexParser(common_strings=True)
-        parser.customization = convert_to_unicode
-        bib_database = bibtexparser.load(bibtex_file, parser=parser)
+# Analysis only needs the entry type, year, journal and booktitle, so the file
+# is scanned with patterns compiled once at import instead of fully parsed.
+# As with bibtexparser, entries start with an @ at the beginning of a line or
+# right after the previous entry, and any text between entries is ignored; a
+# UTF-8 byte order mark at the start of the file is skipped.
+ENTRY_RE = re.compile(rb'(?:^|\A\xef\xbb\xbf)[ \t]*@\s*(\w+)\s*([{(])', re.MULTILINE)
+NEXT_ENTRY_RE = re.compile(rb'\s*@\s*(\w+)\s*([{(])')
+KEY_RE = re.compile(rb'\s*[^\s,]+\s*,')
+SPACE_RE = re.compile(rb'\s*')
+NAME_RE = re.compile(rb'([A-Za-z0-9_().+-]+)\s*=\s*')
+MACRO_RE = re.compile(rb'[^\s,#{}()"=]+')
+CONCAT_RE = re.compile(rb'\s*#\s*')
+QUOTED_RE = re.compile(rb'[{}"]')
+GROUP_RES = {b'}': re.compile(rb'[{}]'), b')': re.compile(rb'[{})]')}
+ANALYZED_FIELDS = {'year', 'journal', 'booktitle'}
+
+def map_file(bibtex_file):
+    # Empty files cannot be memory-mapped
+    if os.fstat(bibtex_file.fileno()).st_size == 0:
+        return b''
+    return mmap.mmap(bibtex_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+def skip_group(data, pos, close):
+    # Return the position after the delimiter closing the group that pos is
+    # in, skipping over braces nested to any depth, or None if it is never closed
+    depth = 0
+    for match in GROUP_RES[close].finditer(data, pos):
+        char = match.group()
+        if char == b'{':
+            depth += 1
+        elif char == b'}' and depth:
+            depth -= 1
+        elif char == close and not depth:
+            return match.end()
+    return None
+
+def skip_quoted(data, pos):
+    # Return the position after the closing quote, or None if it is never
+    # closed; quotes inside braces do not end the value
+    depth = 0
+    for match in QUOTED_RE.finditer(data, pos):
+        char = match.group()
+        if char == b'{':
+            depth += 1
+        elif char == b'}':
+            if not depth:
+                return None
+            depth -= 1
+        elif not depth:
+            return match.end()
+    return None
+
+def read_value(data, pos):
+    # Return the end of a value, including # concatenations, and its parts as
+    # (start, end, is_macro) spans so that unused values are never copied
+    parts = []
+    while True:
+        char = data[pos:pos + 1]
+        if char == b'{':
+            end = skip_group(data, pos + 1, b'}')
+        elif char == b'"':
+            end = skip_quoted(data, pos + 1)
+        else:
+            match = MACRO_RE.match(data, pos)
+            end = match and match.end()
+        if end is None:
+            return None
+        if char in (b'{', b'"'):
+            parts.append((pos + 1, end - 1, False))
+        else:
+            parts.append((pos, end, True))
+        match = CONCAT_RE.match(data, end)
+        if not match:
+            return end, parts
+        pos = match.end()
 
-    # Analyze reference types
-    type_counter = Counter(entry['ENTRYTYPE'] for entry in bib_database.entries)
+def value_text(data, parts, strings):
+    text = []
+    for start, end, is_macro in parts:
+        if is_macro:
+            name = data[start:end].decode('utf-8', 'replace')
+            text.append(strings.get(name.lower(), name))
+        else:
+            text.append(data[start:end].translate(None, b'{}').decode('utf-8', 'replace'))
+    return ' '.join(''.join(text).split())
 
-    # Analyze publication years
-    year_counter = Counter(entry.get('year', 'Unknown') for entry in bib_database.entries)
+def read_fields(data, pos, close, strings, names=None):
+    # Read comma separated name = value pairs up to the closing delimiter of
+    # the entry and return (end, fields), or None for entries bibtexparser
+    # would not parse; only the given (lowercase) names are decoded
+    pairs = []
+    while True:
+        match = NAME_RE.match(data, SPACE_RE.match(data, pos).end())
+        value = match and read_value(data, match.end())
+        if not value:
+            return None
+        pos, parts = value
+        pairs.append((match.group(1).decode('ascii'), parts))
+        pos = SPACE_RE.match(data, pos).end()
+        if data[pos:pos + 1] == b',':
+            pos = SPACE_RE.match(data, pos + 1).end()
+            if data[pos:pos + 1] != close:
+                continue
+        if data[pos:pos + 1] != close:
+            return None
+        break
 
-    # Analyze publications (journals, conferences, etc.)
-    publication_counter = Counter(entry.get('journal', entry.get('booktitle', 'Unknown')) for entry in bib_database.entries)
+    # Resolve repeated names the way bibtexparser does: the first value of
+    # each spelling wins, then spellings are merged case-insensitively
+    spellings = {name: parts for name, parts in reversed(pairs)}
+    fields = {name.lower(): parts for name, parts in spellings.items()}
+    return pos + 1, {name: value_text(data, parts, strings) for name, parts in fields.items()
+                     if names is None or name in names}
+
+def read_entry(data, match, strings):
+    # Return (end, entry type, fields) for the entry, @string or @preamble
+    # block starting at match, or None if bibtexparser would not parse it
+    entry_type = match.group(1).decode('ascii').lower()
+    close = b'}' if match.group(2) == b'{' else b')'
+    if entry_type == 'preamble':
+        end = skip_group(data, match.end(), close)
+        return end and (end, entry_type, None)
+    if entry_type != 'string':
+        match = KEY_RE.match(data, match.end())
+        if not match:
+            return None
+    result = read_fields(data, match.end(), close, strings,
+                         None if entry_type == 'string' else ANALYZED_FIELDS)
+    return result and (result[0], entry_type, result[1])
+
+def scan_entries(data):
+    # Yield (entry type, fields) for each entry, resolving @string macros and
+    # skipping @comment and @preamble blocks. A block that cannot be parsed is
+    # skipped up to the next line starting with an @, as bibtexparser does.
+    # Month macros such as mar are predefined, as with common_strings=True.
+    strings = dict(COMMON_STRINGS)
+    match = ENTRY_RE.search(data)
+    while match:
+        entry_type = match.group(1).decode('ascii').lower()
+        result = None if entry_type == 'comment' else read_entry(data, match, strings)
+        if not result:
+            match = ENTRY_RE.search(data, match.end())
+            continue
+        pos, entry_type, fields = result
+        if entry_type == 'string':
+            strings.update(fields)
+        elif entry_type != 'preamble':
+            yield entry_type, fields
+        match = NEXT_ENTRY_RE.match(data, pos) or ENTRY_RE.search(data, pos)
+
+def analyze_bibtex_file(input_file):
+    # Count reference types, publication years and publications (journals,
+    # conferences, etc.) in a single pass over the memory-mapped file; only
+    # the analyzed field values are ever decoded
+    type_counter, year_counter, publication_counter = Counter(), Counter(), Counter()
+    with open(input_file, 'rb') as bibtex_file:
+        for entry_type, fields in scan_entries(map_file(bibtex_file)):
+            # Non-standard types such as @online are ignored, as bibtexparser does
+            if entry_type not in STANDARD_TYPES:
+                continue
+            type_counter[entry_type] += 1
+            year_counter[fields.get('year', 'Unknown')] += 1
+            publication_counter[fields.get('journal') or fields.get('booktitle') or 'Unknown'] += 1
 
     return type_counter, year_counter, publication_counter
 
-def print_table(counter, title, headers):
-    sorted_data = sorted(counter.items())
+def print_table(rows, title, headers):
     print(f"\n{title}:")
-    print(tabulate(sorted_data, headers=headers, tablefmt='grid'))
+    print(tabulate(rows, headers=headers, tablefmt='grid'))
 
 if __name__ == '__main__':
     input_file = 'input.bib'
     type_counter, year_counter, publication_counter = analyze_bibtex_file(input_file)
 
     # Print reference types table
-    print_table(type_counter, 'Reference Types', ['Type', 'Count'])
+    print_table(sorted(type_counter.items()), 'Reference Types', ['Type', 'Count'])
 
     # Print publication years table sorted by newest order
-    year_counter = {int(k): v for k, v in year_counter.items() if k != 'Unknown'}
-    year_counter = dict(sorted(year_counter.items(), key=lambda x: x[0], reverse=True))
-    print_table(year_counter, 'Publication Years', ['Year', 'Count'])
+    year_rows = sorted(((int(k), v) for k, v in year_counter.items() if k != 'Unknown'), reverse=True)
+    print_table(year_rows, 'Publication Years', ['Year', 'Count'])
 
     # Print publications table sorted by numbers order
-    publication_counter = dict(sorted(publication_counter.items(), key=lambda x: x[1], reverse=True))
-    print_table(publication_counter, 'Publications', ['Publication', 'Count'])
+    print_table(publication_counter.most_common(), 'Publications', ['Publication', 'Count'])
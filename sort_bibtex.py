@@ -1,7 +1,22 @@
 import bibtexparser
 from bibtexparser.bparser import BibTexParser
+from bibtexparser.bwriter import BibTexWriter
 from bibtexparser.customization import convert_to_unicode
-from operator import itemgetter
+
+def write_bibtex_file(bib_database, output_file):
+    # Stream entries through a large buffer instead of building the whole
+    # output string in memory as bibtexparser.dump does. Entries are written in
+    # their current order, so callers sort them by ID first to get the same
+    # output as BibTexWriter's default ordering.
+    writer = BibTexWriter()
+    with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as bibtex_file:
+        bibtex_file.write(writer._comments_to_bibtex(bib_database))
+        bibtex_file.write(writer._preambles_to_bibtex(bib_database))
+        bibtex_file.write(writer._strings_to_bibtex(bib_database))
+        for index, entry in enumerate(bib_database.entries):
+            if index:
+                bibtex_file.write(writer.entry_separator)
+            bibtex_file.write(writer._entry_to_bibtex(entry))
 
 def sort_bibtex_file(input_file, output_file):
     with open(input_file, 'r', encoding='utf-8') as bibtex_file:
@@ -9,12 +24,12 @@ def sort_bibtex_file(input_file, output_file):
         parser.customization = convert_to_unicode
         bib_database = bibtexparser.load(bibtex_file, parser=parser)
 
-    # Sort the entries by reference name
-    bib_database.entries = sorted(bib_database.entries, key=itemgetter('ID'))
+    # Sort the entries by reference name, ignoring case; each key is computed
+    # once per entry and ties keep a deterministic case-sensitive order
+    bib_database.entries.sort(key=lambda entry: (entry['ID'].casefold(), entry['ID']))
 
     # Write the sorted entries to a new BibTeX file
-    with open(output_file, 'w', encoding='utf-8') as sorted_bibtex_file:
-        bibtexparser.dump(bib_database, sorted_bibtex_file)
+    write_bibtex_file(bib_database, output_file)
 
 if __name__ == '__main__':
     input_file = 'input.bib'
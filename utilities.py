@@ -1,76 +1,139 @@
 import bibtexparser
 from bibtexparser.bparser import BibTexParser
 from bibtexparser.customization import convert_to_unicode
-from collections import Counter
-from tabulate import tabulate
-from operator import itemgetter
+from analyze_bibtex import analyze_bibtex_file, print_table
+from sort_bibtex import write_bibtex_file
+import glob
+import hashlib
+import io
+import os
+import pickle
+import sys
+import tempfile
+
+# Parsed databases are pickled here, one file per BibTeX file named after its
+# absolute path and a hash of its content, parser version and parser settings;
+# bump CACHE_VERSION whenever what gets cached changes
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'awesome_citations')
+CACHE_VERSION = 1
+PARSER_CONFIG = f'v{CACHE_VERSION};common_strings=True;customization=convert_to_unicode'
+
+def load_bibtex_file(input_file):
+    with open(input_file, 'rb') as bibtex_file:
+        data = bibtex_file.read()
+
+    # Reuse the parse of an unchanged file from a previous run. The cache is
+    # best-effort: a missing cache file is a miss, and one that cannot be
+    # loaded for any reason is deleted and treated as a miss.
+    path_key = hashlib.sha1(os.path.abspath(input_file).encode()).hexdigest()
+    content_key = hashlib.sha1(data + f'{bibtexparser.__version__};{PARSER_CONFIG}'.encode()).hexdigest()
+    cache_file = os.path.join(CACHE_DIR, f'{path_key}-{content_key}.pkl')
+    try:
+        with open(cache_file, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception:
+        try:
+            os.remove(cache_file)
+        except OSError:
+            pass
+
+    parser = BibTexParser(common_strings=True)
+    parser.customization = convert_to_unicode
+    bib_database = bibtexparser.load(io.StringIO(data.decode('utf-8'), newline=None), parser=parser)
+
+    # Share one string object per repeated value, which also lets pickle
+    # store each of them once in the cache file
+    for entry in bib_database.entries:
+        for field in ('ENTRYTYPE', 'journal', 'booktitle', 'year', 'publisher'):
+            if field in entry:
+                entry[field] = sys.intern(entry[field])
+
+    # The pickle is written to a temporary file and renamed into place, so an
+    # interrupted run never leaves a truncated cache file behind. Caches of
+    # earlier versions of the same file and temporary files left behind by
+    # interrupted runs are then removed, so the cache does not grow on every
+    # edit. Any failure just leaves the file uncached.
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, temp_file = tempfile.mkstemp(prefix=f'{path_key}-', suffix='.tmp', dir=CACHE_DIR)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(bib_database, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file, cache_file)
+        except BaseException:
+            os.remove(temp_file)
+            raise
+        for old_file in glob.glob(os.path.join(glob.escape(CACHE_DIR), f'{path_key}-*')):
+            if old_file != cache_file:
+                try:
+                    os.remove(old_file)
+                except OSError:
+                    pass
+    except Exception:
+        pass
+    return bib_database
+
+def deduplicate_entries(entries):
+    # Remove duplicates based on the reference name, keeping the first occurrence
+    seen = set()
+    unique_entries = []
+    for entry in entries:
+        if entry['ID'] in seen:
+            continue
+        seen.add(entry['ID'])
+        unique_entries.append(entry)
+    return unique_entries
+
+def sort_entries(entries):
+    # Sort the entries by reference name, ignoring case; each key is computed
+    # once per entry and ties keep a deterministic case-sensitive order
+    entries.sort(key=lambda entry: (entry['ID'].casefold(), entry['ID']))
+
+def deduplicate_database(bib_database):
+    # Deduplicate and sort the entries of the database in place and return the
+    # number of duplicates removed
+    entries = deduplicate_entries(bib_database.entries)
+    duplicates = len(bib_database.entries) - len(entries)
+    sort_entries(entries)
+    bib_database.entries = entries
+    return duplicates
 
 def remove_duplicates(input_file, output_file):
-    with open(input_file, 'r', encoding='utf-8') as bibtex_file:
-        parser = BibTexParser(common_strings=True)
-        parser.customization = convert_to_unicode
-        bib_database = bibtexparser.load(bibtex_file, parser=parser)
+    bib_database = load_bibtex_file(input_file)
+    duplicates = deduplicate_database(bib_database)
 
-    # Remove duplicates based on the reference name
-    bib_database.entries = {entry['ID']: entry for entry in bib_database.entries}.values()
-
-    # Write the deduplicated entries to a new BibTeX file
-    with open(output_file, 'w', encoding='utf-8') as deduplicated_bibtex_file:
-        bibtexparser.dump(bib_database, deduplicated_bibtex_file)
+    # Write the deduplicated entries, sorted by reference name, to a new BibTeX file
+    write_bibtex_file(bib_database, output_file)
+    return duplicates
 
 def sort_bibtex_file(input_file, output_file):
-    with open(input_file, 'r', encoding='utf-8') as bibtex_file:
-        parser = BibTexParser(common_strings=True)
-        parser.customization = convert_to_unicode
-        bib_database = bibtexparser.load(bibtex_file, parser=parser)
-
-    # Sort the entries by reference name
-    bib_database.entries = sorted(bib_database.entries, key=itemgetter('ID'))
+    bib_database = load_bibtex_file(input_file)
+    sort_entries(bib_database.entries)
 
     # Write the sorted entries to a new BibTeX file
-    with open(output_file, 'w', encoding='utf-8') as sorted_bibtex_file:
-        bibtexparser.dump(bib_database, sorted_bibtex_file)
-
-def analyze_bibtex_file(input_file):
-    with open(input_file, 'r', encoding='utf-8') as bibtex_file:
-        parser = BibTexParser(common_strings=True)
-        parser.customization = convert_to_unicode
-        bib_database = bibtexparser.load(bibtex_file, parser=parser)
-
-    # Analyze reference types
-    type_counter = Counter(entry['ENTRYTYPE'] for entry in bib_database.entries)
-
-    # Analyze publication years
-    year_counter = Counter(entry.get('year', 'Unknown') for entry in bib_database.entries)
-
-    # Analyze publications (journals, conferences, etc.)
-    publication_counter = Counter(entry.get('journal', entry.get('booktitle', 'Unknown')) for entry in bib_database.entries)
-
-    return type_counter, year_counter, publication_counter
-
-def print_table(counter, title, headers):
-    sorted_data = sorted(counter.items(), key=lambda x: x[1], reverse=True)
-    print(f"\n{title}:")
-    print(tabulate(sorted_data, headers=headers, tablefmt='grid'))
+    write_bibtex_file(bib_database, output_file)
 
 if __name__ == '__main__':
     input_file = 'refs.bib'
-    sorted_file = 'sorted_output.bib'
     deduplicated_file = 'deduplicated_output.bib'
-    sort_bibtex_file(input_file, sorted_file)
-    remove_duplicates(sorted_file, deduplicated_file)
+
+    # Parse once, then deduplicate and sort the entries in memory
+    bib_database = load_bibtex_file(input_file)
+    duplicates = deduplicate_database(bib_database)
+    write_bibtex_file(bib_database, deduplicated_file)
+    print(f'Removed {duplicates} duplicate entries')
     print(f'Deduplicated BibTeX file saved as {deduplicated_file}')
     type_counter, year_counter, publication_counter = analyze_bibtex_file(deduplicated_file)
 
     # Print reference types table
-    print_table(type_counter, 'Reference Types', ['Type', 'Count'])
+    print_table(type_counter.most_common(), 'Reference Types', ['Type', 'Count'])
 
     # Print publication years table sorted by newest order
-    year_counter = {int(k): v for k, v in year_counter.items() if k != 'Unknown'}
-    year_counter = dict(sorted(year_counter.items(), key=lambda x: x[0], reverse=True))
-    print_table(year_counter, 'Publication Years', ['Year', 'Count'])
+    year_rows = sorted(((int(k), v) for k, v in year_counter.items() if k != 'Unknown'), reverse=True)
+    print_table(year_rows, 'Publication Years', ['Year', 'Count'])
 
     # Print publications table sorted by numbers order
-    publication_counter = dict(sorted(publication_counter.items(), key=lambda x: x[1], reverse=True))
-    print_table(publication_counter, 'Publications', ['Publication', 'Count'])
+    print_table(publication_counter.most_common(), 'Publications', ['Publication', 'Count'])
 